@@ -8,6 +8,7 @@ A blog where users can post content and upload/download files to/from S3
 """
 
 from config import init_app, create_bucket
+from profiler import init_profiler
 from routes.home import home_blueprint
 from routes.authentication import authentication_blueprint
 from routes.submissions import submissions_blueprint
@@ -38,6 +39,7 @@ logging.basicConfig(
 # Initialize the app
 app = Flask(__name__)
 init_app(app)
+init_profiler(app)
 
 # Register the blueprints
 app.register_blueprint(home_blueprint)
@@ -41,7 +41,8 @@ def init_app(app):
     Initializes the Flask application with the necessary configurations and settings
 
     - Sets up the Flask application by configuring the secret key, testing mode, login
-        manager, database URI, and initializing the SQLAlchemy object.
+        manager, database URI, post section size, query budget, and initializing the
+        SQLAlchemy object.
     - Also creates the database and tables if they do not exist
 
     Args:
@@ -67,6 +68,21 @@ def init_app(app):
     # Don't track modifications
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # Set the number of bytes in each on-demand section of a paginated post
+    section_size = int(os.getenv("BLOG_SECTION_BYTES", 1024 * 1024))
+    if section_size <= 0:
+        raise ValueError("BLOG_SECTION_BYTES must be greater than 0")
+    app.config["BLOG_SECTION_BYTES"] = section_size
+
+    # Set the number of queries a request may run before the profiler warns
+    try:
+        query_budget = int(os.getenv("REQUEST_QUERY_BUDGET", 5))
+    except ValueError:
+        raise ValueError("REQUEST_QUERY_BUDGET must be an integer")
+    if query_budget < 0:
+        raise ValueError("REQUEST_QUERY_BUDGET must be 0 or greater")
+    app.config["REQUEST_QUERY_BUDGET"] = query_budget
+
     # Initialize the SQLAlchemy object
     db.init_app(app)
 
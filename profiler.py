@@ -0,0 +1,182 @@
+"""
+Per-request profiler for the app
+
+- Records every SQL statement and S3 call made while handling a request, along with
+    their timings
+- Flags statements that are repeated within a request, which usually point to an N+1
+    query, and requests that run more queries than the configured budget
+- Reports each request in an X-Request-Profile response header and a log entry
+- Only enabled in debug mode
+"""
+
+from config import s3
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+import time
+
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Name of the response header holding the profile summary
+PROFILE_HEADER = "X-Request-Profile"
+
+
+class RequestProfile:
+    """The SQL statements and S3 calls made while handling a single request"""
+
+    def __init__(self, query_budget: int):
+        self.query_budget = query_budget
+        self.start_time = time.perf_counter()
+        self.queries = []
+        self.s3_calls = []
+
+    def add_query(self, statement: str, duration: float):
+        """Records a SQL statement and how long it took in seconds"""
+        self.queries.append((statement, duration))
+
+    def add_s3_call(self, operation: str, duration: float):
+        """Records an S3 operation and how long it took in seconds"""
+        self.s3_calls.append((operation, duration))
+
+    def repeated_queries(self) -> dict:
+        """
+        Returns the SQL statements that ran more than once
+
+        Returns:
+            dict: the number of times each repeated statement ran, keyed by statement
+        """
+        counts = {}
+        for statement, _ in self.queries:
+            counts[statement] = counts.get(statement, 0) + 1
+        return {statement: count for statement, count in counts.items() if count > 1}
+
+    def over_budget(self) -> bool:
+        """Returns whether the request ran more queries than the query budget"""
+        return len(self.queries) > self.query_budget
+
+    def summary(self) -> str:
+        """
+        Returns a one-line summary of the profile
+
+        Returns:
+            str: the summary, for example
+                "queries=2; query_ms=1.2; slowest_query_ms=0.9; s3_calls=1;
+                s3_ms=8.4; total_ms=11.0; repeated=0; over_budget=false"
+        """
+        query_ms = sum(duration for _, duration in self.queries) * 1000
+        slowest_query_ms = max((d for _, d in self.queries), default=0) * 1000
+        s3_ms = sum(duration for _, duration in self.s3_calls) * 1000
+        total_ms = (time.perf_counter() - self.start_time) * 1000
+        return (
+            f"queries={len(self.queries)}; query_ms={query_ms:.1f}; "
+            f"slowest_query_ms={slowest_query_ms:.1f}; "
+            f"s3_calls={len(self.s3_calls)}; s3_ms={s3_ms:.1f}; "
+            f"total_ms={total_ms:.1f}; repeated={len(self.repeated_queries())}; "
+            f"over_budget={str(self.over_budget()).lower()}"
+        )
+
+
+def _current_profile():
+    """Returns the profile of the current request, or None outside of a request"""
+    if has_request_context():
+        return g.get("request_profile")
+    return None
+
+
+def _request_path() -> str:
+    """Returns the method and path of the current request for log entries"""
+    return f"{request.method} {request.path}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Stores the start time of a SQL statement on the statement's context"""
+    if context is not None:
+        context.profiler_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Records a finished SQL statement on the current request's profile"""
+    start_time = getattr(context, "profiler_start_time", None)
+    profile = _current_profile()
+    if profile is not None and start_time is not None:
+        profile.add_query(statement, time.perf_counter() - start_time)
+
+
+def _before_s3_call(context, **kwargs):
+    """Stores the start time of an S3 call on the call's context"""
+    context["profiler_start_time"] = time.perf_counter()
+
+
+def _after_s3_call(model, context, **kwargs):
+    """Records a finished S3 call on the current request's profile"""
+    start_time = context.get("profiler_start_time")
+    profile = _current_profile()
+    if profile is not None and start_time is not None:
+        profile.add_s3_call(model.name, time.perf_counter() - start_time)
+
+
+def init_profiler(app):
+    """
+    Enables the per-request profiler on the Flask application in debug mode
+
+    - Listens to every SQL statement executed by SQLAlchemy and every call made by the
+        S3 client
+    - Starts a profile before each request and reports it after each request in the
+        X-Request-Profile header and the log
+    - Logs each SQL statement and S3 call of the request with its timing at debug
+        level
+    - Logs a warning when a statement is repeated within a request or the request runs
+        more queries than REQUEST_QUERY_BUDGET
+
+    Args:
+        app (Flask): The Flask application instance to be profiled.
+    """
+    if not app.config["TESTING"]:
+        return
+
+    # Listen to SQL statements and S3 calls
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        s3.meta.events.register("before-call.s3", _before_s3_call)
+        s3.meta.events.register("after-call.s3", _after_s3_call)
+
+    @app.before_request
+    def start_profile():
+        """Starts the profile of the current request"""
+        g.request_profile = RequestProfile(app.config["REQUEST_QUERY_BUDGET"])
+
+    @app.after_request
+    def report_profile(response):
+        """Reports the profile of the current request"""
+        profile = g.get("request_profile")
+        if profile is None:
+            return response
+
+        summary = profile.summary()
+        response.headers[PROFILE_HEADER] = summary
+        logger.info(f"Request profile for {_request_path()}: {summary}")
+
+        for statement, duration in profile.queries:
+            logger.debug(
+                f"Query in {_request_path()} ({duration * 1000:.1f} ms): {statement}"
+            )
+        for operation, duration in profile.s3_calls:
+            logger.debug(
+                f"S3 call in {_request_path()} ({duration * 1000:.1f} ms): {operation}"
+            )
+
+        for statement, count in profile.repeated_queries().items():
+            logger.warning(
+                f"Possible N+1 query in {_request_path()}: ran {count} times: "
+                f"{statement}"
+            )
+        if profile.over_budget():
+            logger.warning(
+                f"Query budget exceeded in {_request_path()}: ran "
+                f"{len(profile.queries)} queries, budget is {profile.query_budget}"
+            )
+        return response
@@ -21,6 +21,8 @@ from flask import (
     send_from_directory,
     redirect,
     abort,
+    stream_template,
+    Response,
 )
 from flask_login import login_required, current_user
 from sqlalchemy.exc import SQLAlchemyError
@@ -28,6 +30,7 @@ import boto3
 from werkzeug.utils import secure_filename
 from botocore.exceptions import ClientError
 import requests
+import codecs
 import os
 import logging
 
@@ -37,6 +40,108 @@ submissions_blueprint = Blueprint("submissions", __name__)
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Number of bytes read from the S3 body per chunk when streaming a post
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Longest UTF-8 encoded character, used to complete characters split by a range
+MAX_UTF8_CHAR_BYTES = 4
+
+
+def iter_decoded_body(body, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Yields the text of an S3 object body one chunk at a time
+
+    - Reads the body incrementally and decodes it with an incremental UTF-8 decoder
+        so multi-byte characters split across chunks are decoded correctly
+    - Replaces invalid UTF-8 bytes with U+FFFD, since the response has already
+        started by the time they are read and an error page can no longer be sent
+    - Closes the body once it is exhausted or the consumer stops iterating
+
+    Args:
+        body (StreamingBody): the "Body" of an S3 get_object response
+        chunk_size (int): the number of bytes to read per chunk
+
+    Yields:
+        str: the decoded text of each chunk
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        for raw_chunk in body.iter_chunks(chunk_size=chunk_size):
+            text = decoder.decode(raw_chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+    finally:
+        body.close()
+
+
+def _char_boundary(data: bytes, index: int) -> int:
+    """
+    Returns the first index at or after index that starts a UTF-8 character
+
+    Args:
+        data (bytes): the UTF-8 encoded bytes
+        index (int): the index to start looking from
+
+    Returns:
+        int: the index of the first byte that is not a UTF-8 continuation byte
+    """
+    while index < len(data) and data[index] & 0xC0 == 0x80:
+        index += 1
+    return index
+
+
+def get_section(s3_key: str, section: int):
+    """
+    Retrieves one section of a post from S3 by byte range
+
+    - Requests the section's byte range plus enough extra bytes to finish a character
+        split at the end of the range
+    - Moves both ends of the section forward to character boundaries so that every
+        character belongs to exactly one section
+    - Treats an empty post as a single empty section
+    - Reads the section size from the BLOG_SECTION_BYTES app config
+
+    Args:
+        s3_key (str): the S3 key of the post
+        section (int): the zero-based index of the section
+
+    Returns:
+        tuple[str, int]: the decoded text of the section and the total number of
+            sections in the post
+
+    Raises:
+        ClientError: If there is an error fetching the range from S3, including a
+            range past the end of the object
+        UnicodeDecodeError: If the section is not valid UTF-8
+    """
+    section_size = current_app.config["BLOG_SECTION_BYTES"]
+    start = section * section_size
+    end = start + section_size + MAX_UTF8_CHAR_BYTES - 1
+    try:
+        obj = s3.get_object(
+            Bucket=os.getenv("S3_BUCKET_NAME"),
+            Key=s3_key,
+            Range=f"bytes={start}-{end}",
+        )
+    except ClientError as e:
+        # S3 reports any range of an empty object as InvalidRange
+        if section == 0 and e.response.get("Error", {}).get("Code") == "InvalidRange":
+            return "", 1
+        raise
+    data = obj["Body"].read()
+    obj["Body"].close()
+
+    # The ContentRange header is of the form "bytes start-end/total"
+    total_size = int(obj["ContentRange"].rsplit("/", 1)[1])
+    section_count = max(1, -(-total_size // section_size))
+
+    first = _char_boundary(data, 0) if section > 0 else 0
+    last = _char_boundary(data, section_size)
+    return data[first:last].decode("utf-8"), section_count
+
 
 @submissions_blueprint.route("/upload", methods=["GET", "POST"])
 @login_required
@@ -263,9 +368,25 @@ def get_file(username: str, filename: str):
         username (str): The username of the user whose file is to be retrieved.
         filename (str): The name of the file to be retrieved.
 
+    Query Parameters:
+        mode (str): How the post is rendered
+            - "stream": streams the post while it is read from S3
+            - "sections": renders the first section of the post and loads the rest
+                on demand by byte range
+            - anything else: reads the whole post before rendering it
+
     Returns:
         render_template("view.html", filename=filename, content=file_content):
             Renders the view.html template with the file content if successful
+        stream_template("view.html", filename=filename, chunks=chunks): Streams the
+            view.html template as the file content is read if mode is "stream"
+        render_template(
+                "view.html",
+                filename=filename,
+                content=file_content,
+                section_urls=section_urls
+        ): Renders the view.html template with the first section of the file and
+            links to the remaining sections if mode is "sections"
         render_template(
                 "error.html",
                 error_title="User Not Found",
@@ -310,9 +431,39 @@ def get_file(username: str, filename: str):
     if os.getenv("ENVIRONMENT") in ["development", "staging"]:
         logger.info(f"Generated S3 key: {s3_key}")
 
+    mode = request.args.get("mode")
+
     try:
+        if mode == "sections":
+            # Get only the first section of the object from the S3 bucket
+            file_content, section_count = get_section(s3_key, 0)
+            section_urls = [
+                url_for(
+                    "submissions.get_file_section",
+                    username=username,
+                    filename=filename,
+                    section=section,
+                )
+                for section in range(1, section_count)
+            ]
+            logger.info(f"Rendering section 1 of {section_count} for {s3_key}")
+            return render_template(
+                "view.html",
+                filename=filename,
+                content=file_content,
+                section_urls=section_urls,
+            )
+
         # Get the object from the S3 bucket
         obj = s3.get_object(Bucket=os.getenv("S3_BUCKET_NAME"), Key=s3_key)
+
+        if mode == "stream":
+            # Stream the file content into the template as it is read
+            logger.info(f"Streaming file content for {s3_key}")
+            return stream_template(
+                "view.html", filename=filename, chunks=iter_decoded_body(obj["Body"])
+            )
+
         # Read the file content
         file_content = obj["Body"].read().decode("utf-8")
         if os.getenv("ENVIRONMENT") in ["development", "staging"]:
@@ -343,3 +494,115 @@ def get_file(username: str, filename: str):
             ),
             500,
         )
+
+
+@submissions_blueprint.route("/blog/<username>/<filename>/sections/<int:section>")
+def get_file_section(username: str, filename: str, section: int):
+    """
+    Route to retrieve one section of a specific file for a user
+
+    - Allows the paginated view of a blog post to load its sections on demand
+    - Fetches only the section's byte range from the S3 bucket
+
+    Parameters:
+        username (str): The username of the user whose file is to be retrieved.
+        filename (str): The name of the file to be retrieved.
+        section (int): The zero-based index of the section to be retrieved.
+
+    Returns:
+        Response(section_content, mimetype="text/plain"): The text of the section if
+            successful
+        render_template(
+                "error.html",
+                error_title="User Not Found",
+                error_message="The specified user does not exist.",
+                url_for=url_for
+        ), 404: Renders the error.html template with a user not found message and a
+            404 status code if the user is not found
+        render_template(
+                "error.html",
+                error_title="Section Not Found",
+                error_message="The specified section does not exist.",
+                url_for=url_for
+        ), 404: Renders the error.html template with a section not found message and
+            a 404 status code if the section is past the end of the file
+        render_template(
+                "error.html",
+                error_title="S3 Error",
+                error_message="There was an error fetching the file from S3.",
+                url_for=url_for
+        ), 500: Renders the error.html template with an S3 error message and a 500
+            status code if an S3-specific error occurs
+        render_template(
+            "error.html",
+            error_title="Unexpected Error",
+            error_message="An unexpected error occurred.",
+            url_for=url_for
+        ), 500: Renders the error.html template with a generic error message and a 500
+            status code if an unexpected error occurs, such as a section that is not
+            valid UTF-8
+
+    Raises:
+        ClientError: If there is an error interacting with the S3 bucket.
+        Exception: If there is an unexpected error.
+    """
+    logger.info(
+        f"Request to get section {section} of file for user: {username}, "
+        f"filename: {filename}"
+    )
+
+    # Query the database for the user
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        logger.warning(f"User not found: {username}")
+        return (
+            render_template(
+                "error.html",
+                error_title="User Not Found",
+                error_message="The specified user does not exist.",
+                url_for=url_for,
+            ),
+            404,
+        )
+
+    s3_key = f"{username}/{filename}.txt"
+
+    try:
+        section_content, _ = get_section(s3_key, section)
+        return Response(section_content, mimetype="text/plain")
+    except ClientError as e:
+        # A range past the end of the object is reported as InvalidRange
+        if e.response.get("Error", {}).get("Code") == "InvalidRange":
+            logger.warning(f"Section {section} out of range for {s3_key}")
+            return (
+                render_template(
+                    "error.html",
+                    error_title="Section Not Found",
+                    error_message="The specified section does not exist.",
+                    url_for=url_for,
+                ),
+                404,
+            )
+        # Handle other S3-specific errors
+        logger.error(f"S3 error occurred: {e}")
+        return (
+            render_template(
+                "error.html",
+                error_title="S3 Error",
+                error_message="There was an error fetching the file from S3.",
+                url_for=url_for,
+            ),
+            500,
+        )
+    except Exception as e:
+        # Handle any other exceptions
+        logger.error(f"Unexpected error occurred: {e}")
+        return (
+            render_template(
+                "error.html",
+                error_title="Unexpected Error",
+                error_message="An unexpected error occurred.",
+                url_for=url_for,
+            ),
+            500,
+        )
@@ -0,0 +1,76 @@
+"""Tests for the per-request profiler"""
+
+import os
+
+# The profiler is only enabled in debug mode
+os.environ["BACKEND_DEBUG_MODE"] = "True"
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+from config import init_app
+from models.user import User
+from profiler import init_profiler, PROFILE_HEADER
+from flask import Flask
+import logging
+import pytest
+
+
+def create_app(monkeypatch, query_budget: str):
+    """Creates an app with the profiler and a route that repeats a user lookup"""
+    monkeypatch.setenv("REQUEST_QUERY_BUDGET", query_budget)
+    app = Flask(__name__)
+    init_app(app)
+    init_profiler(app)
+
+    @app.route("/repeated")
+    def repeated():
+        for _ in range(3):
+            User.query.filter_by(username="nobody").first()
+        return "ok"
+
+    return app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    return create_app(monkeypatch, "0").test_client()
+
+
+def test_profile_header(client):
+    response = client.get("/repeated")
+    profile = response.headers[PROFILE_HEADER]
+    assert "queries=3;" in profile
+    assert "s3_calls=0;" in profile
+    assert "repeated=1;" in profile
+    assert "over_budget=true" in profile
+
+
+def test_repeated_query_warning(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="profiler"):
+        client.get("/repeated")
+    assert any(
+        "Possible N+1 query in GET /repeated: ran 3 times" in record.message
+        for record in caplog.records
+    )
+
+
+def test_query_budget_warning(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="profiler"):
+        client.get("/repeated")
+    assert any(
+        "Query budget exceeded in GET /repeated: ran 3 queries, budget is 0"
+        in record.message
+        for record in caplog.records
+    )
+
+
+def test_queries_logged_with_timings(client, caplog):
+    with caplog.at_level(logging.DEBUG, logger="profiler"):
+        client.get("/repeated")
+    query_logs = [r for r in caplog.records if r.message.startswith("Query in")]
+    assert len(query_logs) == 3
+    assert all(" ms): SELECT" in record.message for record in query_logs)
+
+
+def test_negative_query_budget(monkeypatch):
+    with pytest.raises(ValueError, match="REQUEST_QUERY_BUDGET must be 0 or greater"):
+        create_app(monkeypatch, "-1")